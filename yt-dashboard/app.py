@@ -1,11 +1,15 @@
+import hashlib
+
 import streamlit as st
 import pandas as pd
+import numpy as np
 from fpdf import FPDF
-import io
+
+from yt_core import LIVE_RE, TOTAL_RE, parse_csv_bytes, parse_dates, resolve_columns, to_num
 
 # --- 1. SAFE DEPENDENCY CHECK ---
 try:
-    import google.generativeapi as genai
+    import google.generativeai as genai
     HAS_GENAI = True
 except ImportError:
     HAS_GENAI = False
@@ -15,52 +19,51 @@ st.set_page_config(page_title="YouTube Strategy Dashboard", layout="wide")
 st.title("📊 YouTube Growth Strategy")
 st.subheader("Data-Driven Content Analysis & Strategic Planning")
 
-# --- 3. CONFIG & HELPERS ---
-LIVE_KEYWORDS = ['live!', 'watchalong', 'stream', "let's play", 'd&d', 'diablo', 'ready player nerd']
+# --- 3. SIDEBAR SETTINGS ---
+with st.sidebar:
+    st.header("AI Strategy Config")
+    if HAS_GENAI:
+        api_key = st.text_input("Enter Gemini API Key", type="password")
+        if api_key:
+            genai.configure(api_key=api_key)
+    else:
+        api_key = None
+        st.warning("⚠️ AI Library missing. Using manual 'Copy-Paste' mode.")
 
-def load_yt_csv(file):
-    raw_bytes = file.getvalue()
+# A Unicode TTF keeps emoji/non-Latin characters in video titles instead of
+# silently dropping them through the latin-1 round trip below
+_TTF_DIR = "/usr/share/fonts/truetype/dejavu"
+
+def _register_font(pdf):
     try:
-        content = raw_bytes.decode("utf-8").splitlines()
-    except UnicodeDecodeError:
-        content = raw_bytes.decode("utf-16").splitlines()
-    
-    header_idx = 0
-    for i, line in enumerate(content):
-        if any(term in line for term in ["Content", "Video title", "Video publish time"]):
-            header_idx = i
-            break
-            
-    file.seek(0)
-    df = pd.read_csv(file, skiprows=header_idx, sep=None, engine='python')
-    df.columns = df.columns.str.strip().str.replace('"', '')
-    return df
-
-def find_column(df, possible_names):
-    for name in possible_names:
-        for col in df.columns:
-            if name.lower() in col.lower():
-                return col
-    return None
-
-def to_num(series):
-    return pd.to_numeric(series.astype(str).str.replace(',', '').str.replace('%', ''), errors='coerce').fillna(0)
+        pdf.add_font("DejaVu", "", f"{_TTF_DIR}/DejaVuSans.ttf")
+        pdf.add_font("DejaVu", "B", f"{_TTF_DIR}/DejaVuSans-Bold.ttf")
+        return "DejaVu"
+    except Exception:
+        return "Helvetica"  # core font: latin-1 only, but always available
 
 # ENHANCED PDF GENERATOR: Includes Strategic Ranking Summary
 def create_categorized_pdf(df_source, v_m, s_m, l_m, v_col, s_col, c_col):
     pdf = FPDF()
     pdf.set_auto_page_break(auto=True, margin=15)
     pdf.add_page()
-    
+    font = _register_font(pdf)
+
+    def clean_text(value, width):
+        text = str(value)[:width]
+        if font == "Helvetica":
+            text = text.encode('latin-1', 'ignore').decode('latin-1')
+        return text
+
     # Title
-    pdf.set_font("Arial", 'B', 16)
+    pdf.set_font(font, 'B', 16)
     pdf.cell(200, 10, txt="YouTube Strategic Content Audit", ln=True, align='C')
     
     # Format Efficiency Summary
     pdf.ln(5)
-    pdf.set_font("Arial", 'B', 12)
+    pdf.set_font(font, 'B', 12)
     pdf.cell(200, 10, txt="Format Efficiency Summary (2026)", ln=True)
-    pdf.set_font("Arial", '', 10)
+    pdf.set_font(font, '', 10)
     pdf.multi_cell(0, 7, txt=(
         f"Long-form: {v_m['Published']} posts | {v_m['Subscribers']} Subs | {v_m['Views']:,} Views | {v_m['CTR']:.2f}% Avg CTR\n"
         f"Shorts: {s_m['Published']} posts | {s_m['Subscribers']} Subs | {s_m['Views']:,} Views | {s_m['CTR']:.2f}% Avg CTR\n"
@@ -69,27 +72,27 @@ def create_categorized_pdf(df_source, v_m, s_m, l_m, v_col, s_col, c_col):
 
     # STRATEGIC RANKING OVERVIEW (Top/Bottom 5)
     pdf.ln(5)
-    pdf.set_font("Arial", 'B', 13)
+    pdf.set_font(font, 'B', 13)
     pdf.cell(200, 10, txt="Strategic Audit: High/Low Performers", ln=True)
     
     def add_rank_table(pdf_obj, data, title, is_top=True):
         if data.empty: return
-        pdf_obj.set_font("Arial", 'B', 10)
+        pdf_obj.set_font(font, 'B', 10)
         color = (0, 100, 0) if is_top else (150, 0, 0)
         pdf_obj.set_text_color(*color)
         pdf_obj.cell(200, 8, txt=title, ln=True)
         pdf_obj.set_text_color(0, 0, 0)
         
-        pdf_obj.set_font("Arial", 'B', 8)
+        pdf_obj.set_font(font, 'B', 8)
         pdf_obj.cell(100, 7, "Title", 1)
         pdf_obj.cell(30, 7, "Views", 1)
         pdf_obj.cell(30, 7, "Subs", 1)
         pdf_obj.cell(30, 7, "CTR", 1, ln=True)
         
-        pdf_obj.set_font("Arial", '', 7)
+        pdf_obj.set_font(font, '', 7)
         subset = data.head(5) if is_top else data.tail(5).iloc[::-1]
         for _, row in subset.iterrows():
-            t = str(row['Video title'])[:55].encode('latin-1', 'ignore').decode('latin-1')
+            t = clean_text(row['Video title'], 55)
             pdf_obj.cell(100, 6, t, 1)
             pdf_obj.cell(30, 6, f"{row[v_col]:,.0f}", 1)
             pdf_obj.cell(30, 6, f"{row[s_col]:,.0f}", 1)
@@ -106,78 +109,204 @@ def create_categorized_pdf(df_source, v_m, s_m, l_m, v_col, s_col, c_col):
 
     # FULL GRANULAR LIST
     pdf.add_page()
-    pdf.set_font("Arial", 'B', 13)
+    pdf.set_font(font, 'B', 13)
     pdf.cell(200, 10, txt="Full Content Inventory", ln=True)
 
     def add_category_section(pdf_obj, data, title):
         if data.empty: return
         pdf_obj.ln(5)
-        pdf_obj.set_font("Arial", 'B', 11)
+        pdf_obj.set_font(font, 'B', 11)
         pdf_obj.cell(200, 10, txt=f"Category: {title}", ln=True)
-        pdf_obj.set_font("Arial", 'B', 9)
+        pdf_obj.set_font(font, 'B', 9)
         pdf_obj.cell(85, 8, "Title", 1)
         pdf_obj.cell(25, 8, "Views", 1)
         pdf_obj.cell(20, 8, "Subs", 1)
         pdf_obj.cell(25, 8, "Watch Hrs", 1)
         pdf_obj.cell(20, 8, "CTR", 1, ln=True)
-        pdf_obj.set_font("Arial", '', 8)
-        for _, row in data.sort_values(by=v_col, ascending=False).iterrows():
-            clean_title = str(row['Video title'])[:45].encode('latin-1', 'ignore').decode('latin-1')
+        pdf_obj.set_font(font, '', 8)
+        for _, row in data.iterrows():
+            clean_title = clean_text(row['Video title'], 45)
             pdf_obj.cell(85, 7, clean_title, 1)
             pdf_obj.cell(25, 7, f"{row[v_col]:,.0f}", 1)
             pdf_obj.cell(20, 7, f"{row[s_col]:,.0f}", 1)
             pdf_obj.cell(25, 7, f"{row['Watch time (hours)']:,.1f}", 1)
             pdf_obj.cell(20, 7, f"{row[c_col]:.1f}%", 1, ln=True)
 
+    # v_data/s_data arrive pre-sorted above; only the live slice needs its own sort
     add_category_section(pdf, v_data, "Long-form Videos")
     add_category_section(pdf, s_data, "Shorts")
-    add_category_section(pdf, df_source[df_source['Category'] == 'Live Stream'], "Live Streams")
+    l_data = df_source[df_source['Category'] == 'Live Stream'].sort_values(by=v_col, ascending=False)
+    add_category_section(pdf, l_data, "Live Streams")
     
     return bytes(pdf.output())
 
+# The model object carries the HTTP session/auth state; keep it alive for the
+# session instead of rebuilding (and re-handshaking) on every generate click.
+# Keyed on the key fingerprint so entering a new API key makes a fresh one.
+@st.cache_resource(show_spinner=False)
+def _get_model(key_hash):
+    return genai.GenerativeModel('gemini-1.5-flash')
+
+# Memoized per prompt + API-key fingerprint so repeated clicks on the same
+# CSV don't re-issue a multi-second (and billable) LLM request
+@st.cache_data(ttl=3600, show_spinner=False)
+def _generate_game_plan(prompt, key_hash, _placeholder):
+    model = _get_model(key_hash)
+    game_plan = ""
+    # Stream so the first tokens render immediately instead of blocking
+    # the app until the full response arrives
+    for chunk in model.generate_content(prompt, stream=True):
+        game_plan += chunk.text
+        _placeholder.markdown(game_plan)
+    return game_plan
+
+# FULL PREPROCESSING: parse, categorize, and aggregate once per upload.
+# Cached so tab switches and button clicks render from memoized frames.
+@st.cache_data(show_spinner=False)
+def process(raw_bytes):
+    df_raw = parse_csv_bytes(raw_bytes)
+    cols = resolve_columns(df_raw, {
+        'title': ['Video title', 'Title'],
+        'date': ['Video publish time', 'Published', 'Date'],
+        'duration': ['Duration'],
+        'views': ['Views'],
+        'subs': ['Subscribers'],
+        'watch': ['Watch time (hours)', 'Watch time'],
+        'impressions': ['Impressions'],
+        'ctr': ['Impressions click-through rate (%)', 'CTR'],
+    })
+    title_col, date_col, dur_col = cols['title'], cols['date'], cols['duration']
+    views_col, subs_col, watch_col = cols['views'], cols['subs'], cols['watch']
+    imp_col, ctr_col = cols['impressions'], cols['ctr']
+
+    if not all([title_col, views_col, subs_col]):
+        return None
+
+    total_mask = df_raw.iloc[:, 0].astype(str).str.contains(TOTAL_RE, na=False)
+    if total_mask.any():
+        # Parse the summary row's numbers here, in the cached path, so the
+        # display code reads clean scalars instead of re-parsing per metric
+        total_df = df_raw[total_mask]
+        clean = {col: to_num(total_df[col])
+                 for col in (views_col, subs_col, watch_col, imp_col, ctr_col) if col}
+        total_row = total_df.assign(**clean).iloc[0]
+    else:
+        total_row = None
+    # Copy-on-write means the slice shares buffers until a column is actually
+    # replaced, so the old defensive .copy() just doubled memory for nothing
+    df_data = df_raw[~total_mask]
+
+    for col in [views_col, subs_col, watch_col, imp_col, ctr_col]:
+        if col: df_data[col] = to_num(df_data[col])
+
+    # Vectorized categorization: one C-level scan instead of a Python call per row
+    titles = df_data[title_col].astype(str)
+    duration = df_data[dur_col] if dur_col else pd.Series(0, index=df_data.index)
+    is_live = titles.str.contains(LIVE_RE, regex=True, na=False) & (duration > 300)
+    is_short = titles.str.contains('#', regex=False) | (duration <= 60)
+    # Select integer codes directly rather than materializing a string array
+    # that Categorical would immediately have to re-factorize
+    codes = np.select([is_live.to_numpy(), is_short.to_numpy()], [2, 1], default=0)
+    df_data['Category'] = pd.Categorical.from_codes(
+        codes, categories=['Videos', 'Shorts', 'Live Stream'])
+    df_data['Parsed_Date'] = parse_dates(df_data[date_col])
+    # Compare years on the raw datetime64 array; NaT maps far outside any real year
+    years = df_data['Parsed_Date'].to_numpy().astype('datetime64[Y]').astype(np.int64) + 1970
+    df_2026 = df_data[years == 2026].copy()
+
+    # All per-category sums in a single groupby pass; CTR stays impression-weighted.
+    # Category is a 3-level Categorical: keep observed=True/sort=False on any
+    # groupby over it - they sidestep the known slow paths (empty-level
+    # materialization, group sorting) that make categorical groupbys expensive.
+    df_2026['_ctr_imp'] = df_2026[ctr_col] * df_2026[imp_col]
+    cat_agg = df_2026.groupby('Category', sort=False, observed=True).agg(
+        Published=(title_col, 'size'), Subscribers=(subs_col, 'sum'), WatchTime=(watch_col, 'sum'),
+        Impressions=(imp_col, 'sum'), Views=(views_col, 'sum'), CtrImp=('_ctr_imp', 'sum'))
+
+    def get_cat_metrics(cat_name):
+        if cat_name not in cat_agg.index:
+            return {"Published": 0, "Subscribers": 0, "Watch Time": 0.0, "CTR": 0.0, "Views": 0}
+        row = cat_agg.loc[cat_name]
+        avg_ctr = row['CtrImp'] / row['Impressions'] if row['Impressions'] > 0 else 0
+        return {"Published": int(row['Published']), "Subscribers": row['Subscribers'], "Watch Time": row['WatchTime'], "CTR": avg_ctr, "Views": row['Views']}
+
+    v_m = get_cat_metrics('Videos')
+    s_m = get_cat_metrics('Shorts')
+    l_m = get_cat_metrics('Live Stream')
+
+    # One partition pass instead of a boolean mask per category; rankings only
+    # read these slices, so no defensive copies either
+    groups = {name: g for name, g in df_data.groupby('Category', observed=True)}
+    empty = df_data.iloc[0:0]
+
+    return {
+        'df_data': df_data, 'df_2026': df_2026,
+        'video_df': groups.get('Videos', empty),
+        'shorts_df': groups.get('Shorts', empty),
+        'total_row': total_row,
+        'v_m': v_m, 's_m': s_m, 'l_m': l_m,
+        # Efficiency ratios for the roadmap prompt, derived once alongside the metrics
+        'v_roi': v_m['Subscribers'] / v_m['Published'] if v_m['Published'] > 0 else 0,
+        's_roi': s_m['Subscribers'] / s_m['Published'] if s_m['Published'] > 0 else 0,
+        'cols': cols,
+    }
+
+@st.cache_data(show_spinner=False)
+def format_comparison(v_m, s_m, l_m):
+    # Formatting is cheap but pure, so memoize it instead of re-boxing the
+    # strings on every widget rerun
+    rows = [
+        {"Metric": "Published Count", "Videos": v_m['Published'], "Shorts": s_m['Published'], "Live Streams": l_m['Published']},
+        {"Metric": "Subscribers", "Videos": f"{v_m['Subscribers']:,.0f}", "Shorts": f"{s_m['Subscribers']:,.0f}", "Live Streams": f"{l_m['Subscribers']:,.0f}"},
+        {"Metric": "Views", "Videos": f"{v_m['Views']:,.0f}", "Shorts": f"{s_m['Views']:,.0f}", "Live Streams": f"{l_m['Views']:,.0f}"},
+        {"Metric": "Watch Time (Hrs)", "Videos": f"{v_m['Watch Time']:,.1f}", "Shorts": f"{s_m['Watch Time']:,.1f}", "Live Streams": f"{l_m['Watch Time']:,.1f}"}
+    ]
+    return pd.DataFrame(rows).set_index("Metric")
+
+@st.cache_data(show_spinner=False)
+def build_consultant_prompt(v_roi, s_roi):
+    # The prompt only depends on the two ROI numbers, so tab switches reuse it
+    return f"""
+            SYSTEM ROLE: Senior YouTube Strategy Consultant.
+            OBJECTIVE: Perform a clinical audit of 2026 channel performance to maximize growth efficiency and advise on what to stop doing immediately in order to maximize ROI.
+
+            DIAGNOSTIC DATA:
+            - Long-form Efficiency: {v_roi:.2f} subscribers per post
+            - Shorts Efficiency: {s_roi:.2f} subscribers per post
+
+            REQUIRED ANALYSIS (Referencing the uploaded PDF):
+            1. STOP: Identify specific content themes, formats, or categories that represent low ROI relative to production effort.
+            2. CONTINUE: Identify the Growth — the styles that drive subscribers most effectively.
+            3. GREY AREA: Identify stagnant content that provides views but fails to convert new audience members.
+            4. ACTION PLAN: Provide 3-5 concrete, data-backed steps to increase subscriber acquisition while reducing wasted effort. You do not have to identify one for shorts, videos, and live events individually. You can speak to how one aspect is working but another is failing in the same content type.
+            5. FOLLOW-UP: Based on the granular list in the PDF, which specific recurring keywords or topics in the titles are present in the best performing videos (CTR, Subs, Views) but missing from the lowest performing? Advise on which topics to continue, if they're TV shows or movies, understand that those are only relevant in the moment, they are not evergreen content. If the channel has evergreen content that's doing well, point it out and educate them on why it's succeeding. If the channel does not have any evergreen content, let them know the gap and suggest 3 potential evergreen options they could try based on their video titles (making content related to their niche will be easiest and the most passionate).
+
+            *Important: Maintain a professional, executive tone. Skip all themed lingo or metaphors. Provide objective, quantitative reasoning only.*
+            """
+
 # --- 4. FILE UPLOAD & PROCESSING ---
 uploaded_file = st.file_uploader("Upload 'Table Data.csv' (Content Breakdown)", type="csv")
 
 if uploaded_file:
-    df_raw = load_yt_csv(uploaded_file)
-    title_col = find_column(df_raw, ['Video title', 'Title'])
-    date_col = find_column(df_raw, ['Video publish time', 'Published', 'Date'])
-    dur_col = find_column(df_raw, ['Duration'])
-    views_col = find_column(df_raw, ['Views'])
-    subs_col = find_column(df_raw, ['Subscribers'])
-    watch_col = find_column(df_raw, ['Watch time (hours)', 'Watch time'])
-    imp_col = find_column(df_raw, ['Impressions'])
-    ctr_col = find_column(df_raw, ['Impressions click-through rate (%)', 'CTR'])
-
-    if all([title_col, views_col, subs_col]):
-        total_mask = df_raw.iloc[:, 0].astype(str).str.contains('Total', case=False, na=False)
-        total_row = df_raw[total_mask].iloc[0] if total_mask.any() else None
-        df_data = df_raw[~total_mask].copy()
-
-        for col in [views_col, subs_col, watch_col, imp_col, ctr_col]:
-            if col: df_data[col] = to_num(df_data[col])
-
-        def categorize(row):
-            title = str(row[title_col]).lower()
-            duration = row[dur_col] if dur_col else 0
-            if any(k in title for k in LIVE_KEYWORDS) and duration > 300: return 'Live Stream'
-            if '#' in title or duration <= 60: return 'Shorts'
-            return 'Videos'
-
-        df_data['Category'] = df_data.apply(categorize, axis=1)
-        df_data['Parsed_Date'] = pd.to_datetime(df_data[date_col], errors='coerce')
-        df_2026 = df_data[df_data['Parsed_Date'].dt.year == 2026].copy()
+    # st.cache_data still hashes the raw bytes on every hit, which scales with
+    # the upload size; keying on Streamlit's per-upload id makes plain widget
+    # reruns skip the getvalue() copy and the hash entirely
+    if st.session_state.get('file_id') != uploaded_file.file_id:
+        st.session_state['dash'] = process(uploaded_file.getvalue())
+        st.session_state['file_id'] = uploaded_file.file_id
+    dash = st.session_state['dash']
+
+    if dash is not None:
+        c = dash['cols']
+        title_col, views_col, subs_col = c['title'], c['views'], c['subs']
+        watch_col, imp_col, ctr_col = c['watch'], c['impressions'], c['ctr']
+        df_data, df_2026 = dash['df_data'], dash['df_2026']
+        total_row = dash['total_row']
+        v_m, s_m, l_m = dash['v_m'], dash['s_m'], dash['l_m']
 
         tabs = st.tabs(["Performance Summary", "Audit Rankings", "📄 Export Audit PDF", "🤖 Strategic Roadmap"])
 
         with tabs[0]:
-            def get_cat_metrics(cat_name):
-                group = df_2026[df_2026['Category'] == cat_name]
-                total_imps = group[imp_col].sum()
-                avg_ctr = (group[ctr_col] * group[imp_col]).sum() / total_imps if total_imps > 0 else 0
-                return {"Published": len(group), "Subscribers": group[subs_col].sum(), "Watch Time": group[watch_col].sum(), "CTR": avg_ctr, "Views": group[views_col].sum()}
-
-            v_m = get_cat_metrics('Videos'); s_m = get_cat_metrics('Shorts'); l_m = get_cat_metrics('Live Stream')
             chan_subs = total_row[subs_col] if total_row is not None else (v_m['Subscribers'] + s_m['Subscribers'] + l_m['Subscribers'])
             other_subs = chan_subs - (v_m['Subscribers'] + s_m['Subscribers'] + l_m['Subscribers'])
 
@@ -187,29 +316,25 @@ if uploaded_file:
             h2.metric("Total Subs Gained", f"{chan_subs:,.0f}")
             h3.metric("Other Subscribers", f"{max(0, other_subs):,.0f}")
 
-            comparison_data = [
-                {"Metric": "Published Count", "Videos": v_m['Published'], "Shorts": s_m['Published'], "Live Streams": l_m['Published']},
-                {"Metric": "Subscribers", "Videos": f"{v_m['Subscribers']:,.0f}", "Shorts": f"{s_m['Subscribers']:,.0f}", "Live Streams": f"{l_m['Subscribers']:,.0f}"},
-                {"Metric": "Views", "Videos": f"{v_m['Views']:,.0f}", "Shorts": f"{s_m['Views']:,.0f}", "Live Streams": f"{l_m['Views']:,.0f}"},
-                {"Metric": "Watch Time (Hrs)", "Videos": f"{v_m['Watch Time']:,.1f}", "Shorts": f"{s_m['Watch Time']:,.1f}", "Live Streams": f"{l_m['Watch Time']:,.1f}"}
-            ]
-            st.table(pd.DataFrame(comparison_data).set_index("Metric"))
+            st.table(format_comparison(v_m, s_m, l_m))
 
         with tabs[1]:
             def display_rankings(df, metric_col, label):
-                sorted_df = df.sort_values(by=metric_col, ascending=False)[[title_col, metric_col, watch_col, ctr_col]].copy()
-                sorted_df[ctr_col] = sorted_df[ctr_col].map("{:.2f}%".format)
-                sorted_df[metric_col] = sorted_df[metric_col].map("{:,.0f}".format)
+                # Partial selection (O(n) with a 5-row heap) instead of fully sorting the frame
+                show_cols = [title_col, metric_col, watch_col, ctr_col]
+                top = df.nlargest(5, metric_col)[show_cols].copy()
+                bottom = df.nsmallest(5, metric_col)[show_cols].copy()
+                for part in (top, bottom):
+                    part[ctr_col] = part[ctr_col].map("{:.2f}%".format)
+                    part[metric_col] = part[metric_col].map("{:,.0f}".format)
                 c1, c2 = st.columns(2)
-                c1.success(f"Top 5: {label}"); c1.table(sorted_df.head(5).reset_index(drop=True))
-                c2.error(f"Bottom 5: {label}"); c2.table(sorted_df.tail(5).iloc[::-1].reset_index(drop=True))
+                c1.success(f"Top 5: {label}"); c1.table(top.reset_index(drop=True))
+                c2.error(f"Bottom 5: {label}"); c2.table(bottom.reset_index(drop=True))
 
             st.write("#### Long-Form Video Rankings")
-            video_df = df_data[df_data['Category'] == 'Videos'].copy()
-            display_rankings(video_df, views_col, "Videos by Views")
+            display_rankings(dash['video_df'], views_col, "Videos by Views")
             st.write("#### Shorts Performance Rankings")
-            shorts_df = df_data[df_data['Category'] == 'Shorts'].copy()
-            display_rankings(shorts_df, views_col, "Shorts by Views")
+            display_rankings(dash['shorts_df'], views_col, "Shorts by Views")
 
         with tabs[2]:
             st.markdown("### 📄 Categorized Audit Export")
@@ -219,28 +344,20 @@ if uploaded_file:
 
         with tabs[3]:
             st.markdown("### 🤖 Strategy Game Plan")
-            
-            # ROI Stats for the Prompt
-            v_roi = v_m['Subscribers'] / v_m['Published'] if v_m['Published'] > 0 else 0
-            s_roi = s_m['Subscribers'] / s_m['Published'] if s_m['Published'] > 0 else 0
-            
-            consultant_prompt = f"""
-            SYSTEM ROLE: Senior YouTube Strategy Consultant.
-            OBJECTIVE: Perform a clinical audit of 2026 channel performance to maximize growth efficiency and advise on what to stop doing immediately in order to maximize ROI.
-            
-            DIAGNOSTIC DATA:
-            - Long-form Efficiency: {v_roi:.2f} subscribers per post
-            - Shorts Efficiency: {s_roi:.2f} subscribers per post
-            
-            REQUIRED ANALYSIS (Referencing the uploaded PDF):
-            1. STOP: Identify specific content themes, formats, or categories that represent low ROI relative to production effort.
-            2. CONTINUE: Identify the Growth — the styles that drive subscribers most effectively.
-            3. GREY AREA: Identify stagnant content that provides views but fails to convert new audience members.
-            4. ACTION PLAN: Provide 3-5 concrete, data-backed steps to increase subscriber acquisition while reducing wasted effort. You do not have to identify one for shorts, videos, and live events individually. You can speak to how one aspect is working but another is failing in the same content type.
-            5. FOLLOW-UP: Based on the granular list in the PDF, which specific recurring keywords or topics in the titles are present in the best performing videos (CTR, Subs, Views) but missing from the lowest performing? Advise on which topics to continue, if they're TV shows or movies, understand that those are only relevant in the moment, they are not evergreen content. If the channel has evergreen content that's doing well, point it out and educate them on why it's succeeding. If the channel does not have any evergreen content, let them know the gap and suggest 3 potential evergreen options they could try based on their video titles (making content related to their niche will be easiest and the most passionate). 
-            
-            *Important: Maintain a professional, executive tone. Skip all themed lingo or metaphors. Provide objective, quantitative reasoning only.*
-            """
-            
+
+            # ROI stats come precomputed from the cached process() pass
+            v_roi, s_roi = dash['v_roi'], dash['s_roi']
+
+            consultant_prompt = build_consultant_prompt(v_roi, s_roi)
+
             st.info("💡 **Next Step:** Upload the Categorized Audit PDF to Gemini and paste the prompt below for a professional breakdown.")
             st.code(consultant_prompt, language="markdown")
+
+            if HAS_GENAI and api_key:
+                if st.button("Generate AI Game Plan"):
+                    try:
+                        key_hash = hashlib.sha256(api_key.encode()).hexdigest()[:16]
+                        placeholder = st.empty()
+                        placeholder.markdown(_generate_game_plan(consultant_prompt, key_hash, placeholder))
+                    except Exception as e:
+                        st.error(f"AI Error: {e}")
@@ -0,0 +1,139 @@
+"""Shared data helpers for the YouTube strategy dashboard.
+
+The repo historically carried several near-identical copies of these loaders
+(the snapshots under archive/ still show them). Keeping one implementation
+here means every page shares the same st.cache_data entries instead of each
+copy re-parsing the same upload.
+"""
+import csv
+import io
+import re
+
+import pandas as pd
+import streamlit as st
+
+LIVE_KEYWORDS = ['live!', 'watchalong', 'stream', "let's play", 'd&d', 'diablo', 'ready player nerd']
+# IGNORECASE lets matching run on the raw titles without materializing a
+# lowercased copy of the column first
+LIVE_RE = re.compile("|".join(map(re.escape, LIVE_KEYWORDS)), re.IGNORECASE)
+# Matches the summary row YouTube prepends to its exports
+TOTAL_RE = re.compile('total', re.IGNORECASE)
+# Thousands separators and percent signs in Studio's numeric columns
+_CLEAN_RE = re.compile(r'[,%]')
+
+# Name fragments of every column the dashboard may read; the rest of the
+# export (likes, average view duration, geography, ...) is skipped at parse time
+WANTED_ALIASES = ('content', 'video title', 'title', 'video publish time', 'published', 'date',
+                  'duration', 'views', 'subscribers', 'watch time', 'impressions', 'ctr')
+
+
+@st.cache_data(show_spinner=False)
+def parse_csv_bytes(raw_bytes):
+    # The header always sits in the first few lines, so decode only a small
+    # prefix to find it; pandas performs the single full decode during the read
+    prefix = raw_bytes[:8192]
+    # Studio's UTF-16 exports always carry a BOM, so two bytes decide the
+    # codec up front instead of a speculative decode + exception round trip
+    encoding = "utf-16" if raw_bytes[:2] in (b"\xff\xfe", b"\xfe\xff") else "utf-8"
+    # errors='ignore' also tolerates a multibyte char cut off by the prefix
+    content = prefix.decode(encoding, errors="ignore").splitlines()
+
+    header_idx = 0
+    for i, line in enumerate(content):
+        if any(term in line for term in ["Content", "Video title", "Video publish time"]):
+            header_idx = i
+            break
+
+    # Sniff the delimiter from the header line so the fast C engine can be used
+    # instead of pandas' pure-Python sniffer path
+    sep = max([',', '\t', ';', '|'], key=content[header_idx].count) if content else ','
+
+    # Read only the columns the dashboard uses (the first column always stays
+    # for the Total-row detection)
+    usecols = None
+    if content:
+        header_fields = next(csv.reader(io.StringIO(content[header_idx]), delimiter=sep))
+        wanted = [f for f in header_fields
+                  if f == header_fields[0] or any(a in f.lower() for a in WANTED_ALIASES)]
+        if wanted:
+            usecols = wanted
+
+    # Fastest available parser first: Arrow's multithreaded reader when pyarrow
+    # is installed, then pandas' C engine, with the pure-Python sniffer kept as
+    # the last resort for odd files
+    df = None
+    for engine in ('pyarrow', 'c'):
+        try:
+            df = pd.read_csv(io.BytesIO(raw_bytes), skiprows=header_idx, sep=sep,
+                             engine=engine, encoding=encoding, usecols=usecols)
+            break
+        except Exception:
+            continue
+    if df is None:
+        df = pd.read_csv(io.BytesIO(raw_bytes), skiprows=header_idx, sep=None, engine='python', encoding=encoding)
+    cols = df.columns.str.strip()
+    # The C and pyarrow engines already strip quoting; only pay for the replace
+    # when stray quotes actually survived (python-engine fallback on odd files)
+    if any('"' in c for c in cols):
+        cols = cols.str.replace('"', '', regex=False)
+    df.columns = cols
+    return df
+
+
+def load_yt_csv(file):
+    # Key the cache on the raw upload bytes so reruns skip the parse entirely
+    return parse_csv_bytes(file.getvalue())
+
+
+def find_column(df, possible_names):
+    lowered = [(col.lower(), col) for col in df.columns]
+    for name in possible_names:
+        name_l = name.lower()
+        for col_l, col in lowered:
+            if name_l in col_l:
+                return col
+    return None
+
+
+def resolve_columns(df, name_map):
+    # Lowercase the column names once instead of per find_column call
+    lowered = [(col.lower(), col) for col in df.columns]
+    resolved = {}
+    for key, candidates in name_map.items():
+        resolved[key] = next(
+            (col for name in candidates for col_l, col in lowered if name.lower() in col_l), None)
+    return resolved
+
+
+# Publish-time formats seen in YouTube Studio exports
+_DATE_FORMATS = [
+    ('%Y-%m-%d', re.compile(r'^\d{4}-\d{2}-\d{2}$')),
+    ('%b %d, %Y', re.compile(r'^[A-Za-z]{3} \d{1,2}, \d{4}$')),
+    ('%m/%d/%Y', re.compile(r'^\d{1,2}/\d{1,2}/\d{4}$')),
+]
+
+
+def parse_dates(series):
+    # An explicit format keeps to_datetime on its vectorized fast path instead
+    # of falling back to per-row dateutil parsing
+    sample = series.dropna().astype(str)
+    first = sample.iloc[0].strip() if len(sample) else ''
+    for fmt, pat in _DATE_FORMATS:
+        if pat.match(first):
+            return pd.to_datetime(series, format=fmt, errors='coerce', cache=True)
+    # 'mixed' still parses per element but skips the format-inference pass
+    return pd.to_datetime(series, format='mixed', errors='coerce', cache=True)
+
+
+def to_num(series):
+    if pd.api.types.is_numeric_dtype(series):
+        # Already parsed (e.g. the C engine read it clean) — skip the string dance
+        out = series.fillna(0)
+    else:
+        # One fused scan for both separators instead of two full string passes
+        out = pd.to_numeric(series.astype(str).str.replace(_CLEAN_RE, '', regex=True),
+                            errors='coerce').fillna(0)
+    # Counts (views, subs, impressions) fit in small ints; ratios stay compact floats
+    if (out % 1 == 0).all():
+        return pd.to_numeric(out, downcast='integer')
+    return pd.to_numeric(out, downcast='float')